@@ -1,7 +1,10 @@
 import aiohttp
-import json
 import logging
 
+from homeassistant.util.json import json_loads
+
+from .helpers import error_body
+
 BASE_URL = "https://api.app.knmi.cloud"
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,20 +17,21 @@ class App:
         self._session = aiohttp_session
 
     async def get(self, endpoint: str, params=None):
-        _LOGGER.debug(f"Calling KNMI App API endpoint {endpoint} with {params}")
+        _LOGGER.debug("Calling KNMI App API endpoint %s with %s", endpoint, params)
         async with self._session.get(f"{BASE_URL}/{endpoint}", params=params) as resp:
-            body = await resp.text()
-            try:
-                resp.raise_for_status()
-            except aiohttp.ClientResponseError as e:
-                if e.status == 400:
-                    raise InvalidRequest(json.loads(body)) from None
-                if e.status == 404:
-                    raise NotFoundError("No data found for query") from None
-                elif e.status >= 500:
-                    raise ServerError(f"Status code: {e.status}: {body}") from None
-                raise
-            return json.loads(body)
+            body = await resp.read()
+            status = resp.status
+            if status < 400:
+                return json_loads(body)
+            if status == 400:
+                raise InvalidRequest(error_body(body))
+            if status == 404:
+                raise NotFoundError("No data found for query")
+            elif status >= 500:
+                raise ServerError(
+                    f"Status code: {status}: {body.decode(errors='replace')}"
+                )
+            resp.raise_for_status()
 
     async def weather(self, cell_id, region):
         params = {"location": cell_id, "region": region}
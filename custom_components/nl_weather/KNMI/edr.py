@@ -1,10 +1,15 @@
-import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
 
 import aiohttp
+from aiohttp import hdrs
+from homeassistant.util.json import json_loads
 
-from .helpers import format_dt
+from .helpers import error_body, format_dt
 
 BASE_URL = "https://api.dataplatform.knmi.nl/edr/v1/collections/10-minute-in-situ-meteorological-observations"
 BBOX_NL = "-68.5,12.0,7.4,55.7"
@@ -15,72 +20,88 @@ def past_half_hour(dt: datetime) -> str:
     return f"{format_dt(past)}/{format_dt(dt)}"
 
 
+@lru_cache(maxsize=8)
+def cube_params(parameters: tuple[str, ...]) -> MappingProxyType[str, str]:
+    """Build the query parameters of a cube request that do not change per call."""
+    # Read-only, the cached result is shared by all callers
+    return MappingProxyType({"parameter-name": ",".join(parameters), "bbox": BBOX_NL})
+
+
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class Coverage:
+    """Latest observations of a single station, taken from a CoverageJSON coverage.
+
+    Only the latest values are kept, instead of the deeply nested JSON.
+    """
+
+    location_id: str
+    lat: float
+    lon: float
+    time: datetime
+    values: dict[str, float | None]
+
+    @classmethod
+    def from_json(cls, coverage: dict[str, Any]) -> "Coverage":
+        axes = coverage["domain"]["axes"]
+        return cls(
+            location_id=coverage["eumetnet:locationId"],
+            lat=axes["y"]["values"][0],
+            lon=axes["x"]["values"][0],
+            time=datetime.fromisoformat(axes["t"]["values"][-1]),
+            values={p: r["values"][-1] for p, r in coverage["ranges"].items()},
+        )
+
+
 class EDR:
     _session: aiohttp.ClientSession
 
     def __init__(self, aiohttp_session, token):
         self._session = aiohttp_session
-        self._token = token
+        # The same for every request
+        self._headers = {hdrs.AUTHORIZATION: token}
 
     async def get(self, endpoint: str, params=None):
-        headers = {"Authorization": self._token}
-        _LOGGER.debug(f"Calling EDR API endpoint {endpoint} with {params}")
+        _LOGGER.debug("Calling EDR API endpoint %s with %s", endpoint, params)
         async with self._session.get(
-            f"{BASE_URL}{endpoint}", headers=headers, params=params
+            f"{BASE_URL}{endpoint}", headers=self._headers, params=params
         ) as resp:
-            body = await resp.text()
-            try:
-                resp.raise_for_status()
-            except aiohttp.ClientResponseError as e:
-                if e.status == 400:
-                    raise InvalidRequest(json.loads(body)) from None
-                if e.status == 404:
-                    raise NotFoundError("No data found for query") from None
-                elif e.status == 403:
-                    # TODO: Also handle quota exceeded
-                    raise TokenInvalid(json.loads(body)) from None
-                elif e.status >= 500:
-                    raise ServerError(f"Status code: {e.status}") from None
-                raise
-            return json.loads(body)
+            body = await resp.read()
+            status = resp.status
+            if status < 400:
+                return json_loads(body)
+            if status == 400:
+                raise InvalidRequest(error_body(body))
+            if status == 404:
+                raise NotFoundError("No data found for query")
+            elif status == 403:
+                # TODO: Also handle quota exceeded
+                raise TokenInvalid(error_body(body))
+            elif status >= 500:
+                raise ServerError(f"Status code: {status}")
+            resp.raise_for_status()
 
     async def metadata(self):
         return await self.get("")
 
     async def locations(self):
-        # Get current locations
-        dt = format_dt(datetime.now(timezone.utc))
+        # Get current locations. Minute precision is plenty, and keeps the query the
+        # same for repeated calls within that minute.
+        dt = format_dt(datetime.now(timezone.utc).replace(second=0, microsecond=0))
         params = {"datetime": dt, "bbox": BBOX_NL}
         return await self.get("/locations", params)
 
     async def cube(self, params):
         return await self.get("/cube", params)
 
-    async def location(self, location, params):
-        return await self.get(f"/locations/{location}", params)
-
-    async def get_cube_coverages(self, dt: datetime, parameters):
-        params = {
-            "datetime": past_half_hour(dt),
-            "parameter-name": ",".join(parameters),
-            "bbox": BBOX_NL,
-        }
+    async def get_cube_coverages(self, dt: datetime, parameters) -> list[Coverage]:
+        params = {"datetime": past_half_hour(dt), **cube_params(tuple(parameters))}
         coverage_collection = await self.cube(params)
         coverages = coverage_collection["coverages"]
         _LOGGER.debug(f"Found {len(coverages)} coverages")
-        return coverages
-
-    async def get_location_coverage(self, location, dt: datetime, parameters):
-        params = {
-            "datetime": past_half_hour(dt),
-            "parameter-name": ",".join(parameters),
-        }
-        coverage_collection = await self.location(location, params)
-
-        return coverage_collection["coverages"][0]
+        return [Coverage.from_json(c) for c in coverages]
 
     async def get_latest_datetime(self):
         metadata = await self.metadata()
@@ -1,9 +1,14 @@
 """Helpers for KNMI data processing."""
 
 from dataclasses import dataclass
-from datetime import datetime
-from math import atan2, cos, log, pi, radians, sin, sqrt, tan
-from typing import Any, Final
+from datetime import datetime, timezone
+from math import asin, asinh, cos, radians, sin, sqrt, tan
+from typing import TYPE_CHECKING, Any, Final
+
+from homeassistant.util.json import json_loads
+
+if TYPE_CHECKING:
+    from .edr import Coverage
 
 # Earth radius constants
 EARTH_RADIUS_KM: Final = 6371.0  # Haversine formula Earth radius (kilometers)
@@ -29,17 +34,27 @@ def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     Returns:
         Distance between the two points in kilometers.
     """
+    # For a <= 1 this equals 2 * atan2(sqrt(a), sqrt(1 - a)), with one sqrt less
+    c = 2 * asin(sqrt(_haversine_rank(lat1, lon1, lat2, lon2, cos(radians(lat2)))))
+    return EARTH_RADIUS_KM * c
+
+
+def _haversine_rank(
+    lat1: float, lon1: float, lat2: float, lon2: float, cos_lat2: float
+) -> float:
+    """Return the haversine of the central angle between two points.
+
+    Grows monotonically with the distance, so it ranks points the same as the full
+    Haversine distance without the inverse trigonometry. The cosine of the second
+    latitude is passed in, so it can be computed once when ranking many points
+    against the same location.
+    """
     dlat = radians(lat2 - lat1)
     dlon = radians(lon2 - lon1)
-    a = (
-        sin(dlat / 2) ** 2
-        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    )
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return EARTH_RADIUS_KM * c
+    return sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos_lat2 * sin(dlon / 2) ** 2
 
 
-def coverage_distance(coverage: Any, location: Coordinate) -> float:
+def coverage_distance(coverage: "Coverage", location: Coordinate) -> float:
     """Calculate the distance between a coverage and a location.
 
     Args:
@@ -49,34 +64,66 @@ def coverage_distance(coverage: Any, location: Coordinate) -> float:
     Return:
         Distance in kilometers.
     """
-    return haversine(
-        coverage["domain"]["axes"]["y"]["values"][0],
-        coverage["domain"]["axes"]["x"]["values"][0],
-        location.lat,
-        location.lon,
-    )
+    return haversine(coverage.lat, coverage.lon, location.lat, location.lon)
 
 
-def sort_coverages_on_distance(coverages: list[Any], location: Coordinate):
+def sort_coverages_on_distance(
+    coverages: list["Coverage"], location: Coordinate, exact: int = 5
+) -> list[tuple["Coverage", float | None]]:
     """Sort the coverages closest to the given location.
 
+    Coverages are first ranked on a cheap equirectangular approximation, which is
+    accurate enough over the small extent of the Netherlands. Only the nearest ones
+    are then ranked on their exact Haversine distance.
+
     Args:
-        coverages: List of coverage objects with domain axis information.
+        coverages: List of coverage objects.
         location: Coordinate object for the target location.
+        exact: Number of nearest coverages to rank on their Haversine distance.
 
     Returns:
-        Sorted coverages as tuple (coverage, distance)
+        Sorted coverages as tuple (coverage, distance). The distance is None for the
+        coverages beyond the exactly ranked ones.
     """
-    return sorted(
-        ((c, coverage_distance(c, location)) for c in coverages),
-        key=lambda x: x[1],
-    )
+
+    lat0, lon0 = location.lat, location.lon
+    # A degree of longitude shrinks with the cosine of the latitude
+    cos_lat0 = cos(radians(lat0))
+
+    def rough_distance(coverage: "Coverage") -> float:
+        dx = (coverage.lon - lon0) * cos_lat0
+        dy = coverage.lat - lat0
+        return dx * dx + dy * dy
+
+    def rank(coverage: "Coverage") -> float:
+        return _haversine_rank(coverage.lat, coverage.lon, lat0, lon0, cos_lat0)
+
+    rough = sorted(coverages, key=rough_distance)
+    nearest = sorted(((c, rank(c)) for c in rough[:exact]), key=lambda x: x[1])
+    return [(c, EARTH_RADIUS_KM * 2 * asin(sqrt(a))) for c, a in nearest] + [
+        (c, None) for c in rough[exact:]
+    ]
 
 
 def unique_items_sorted_by_frequency(items):
     return sorted(set(items), key=items.count, reverse=True)
 
 
+def most_frequent(items):
+    """Return the most frequent item, on a tie the one that reached that count first.
+
+    Single pass over the items, without sorting or a count() scan per unique item.
+    """
+    counts = {}
+    best, best_count = None, 0
+    for item in items:
+        count = counts.get(item, 0) + 1
+        counts[item] = count
+        if count > best_count:
+            best, best_count = item, count
+    return best
+
+
 def epsg4325_to_epsg3857(coord: Coordinate) -> tuple[float, float]:
     """Convert a Coordinate from EPSG:4326 to EPSG:3857 meters (x, y).
 
@@ -87,11 +134,45 @@ def epsg4325_to_epsg3857(coord: Coordinate) -> tuple[float, float]:
         Tuple of (x, y) coordinates in EPSG:3857 meters (Web Mercator projection).
     """
     # Clamp latitude to valid Web Mercator range to avoid math domain errors
-    lat = max(min(coord.lat, WEB_MERCATOR_MAX_LAT), -WEB_MERCATOR_MAX_LAT)
+    lat = coord.lat
+    if lat > WEB_MERCATOR_MAX_LAT:
+        lat = WEB_MERCATOR_MAX_LAT
+    elif lat < -WEB_MERCATOR_MAX_LAT:
+        lat = -WEB_MERCATOR_MAX_LAT
     x = EARTH_RADIUS_METERS * radians(coord.lon)
-    y = EARTH_RADIUS_METERS * log(tan(pi / 4.0 + radians(lat) / 2.0))
+    # Equal to log(tan(pi / 4 + lat / 2)), in a single call
+    y = EARTH_RADIUS_METERS * asinh(tan(radians(lat)))
     return x, y
 
 
+def datetime_from_filename(filename: str, prefix: str) -> datetime:
+    """Get the UTC datetime from a file name like <prefix>YYYYMMDDHHMM.<extension>.
+
+    Slices the digits instead of using strptime, which is a lot slower.
+
+    Raises:
+        ValueError: If the file name does not match.
+    """
+    if not filename.startswith(prefix):
+        raise ValueError(f"File name {filename} does not start with {prefix}")
+    i = len(prefix)
+    return datetime(
+        int(filename[i : i + 4]),
+        int(filename[i + 4 : i + 6]),
+        int(filename[i + 6 : i + 8]),
+        int(filename[i + 8 : i + 10]),
+        int(filename[i + 10 : i + 12]),
+        tzinfo=timezone.utc,
+    )
+
+
+def error_body(body: bytes) -> Any:
+    """Parse the body of an error response, which is not always JSON."""
+    try:
+        return json_loads(body)
+    except ValueError:
+        return body.decode(errors="replace")
+
+
 def format_dt(dt: datetime) -> str:
     return dt.isoformat(timespec="seconds").replace("+00:00", "Z")
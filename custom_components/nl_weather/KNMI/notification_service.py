@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import uuid
 
@@ -7,6 +6,7 @@ import aiomqtt
 from aiomqtt import ProtocolVersion, MqttError
 from paho.mqtt import properties
 
+from homeassistant.util.json import json_loads
 from homeassistant.util.ssl import get_default_context
 
 _LOGGER = logging.getLogger(__name__)
@@ -67,18 +67,18 @@ class NotificationService:
                 await asyncio.sleep(30)
 
     async def handle_message(self, message):
-        event = json.loads(message.payload)
+        event = json_loads(message.payload)
         dataset = event["data"]["datasetName"]
-        _LOGGER.debug(f"MQTT event: {event}")
+        _LOGGER.debug("MQTT event: %s", event)
 
-        if self._callbacks[dataset] is not None:
+        # One connection serves all datasets, only wake up who registered for this one
+        callbacks = self._callbacks.get(dataset)
+        if callbacks:
             try:
-                await asyncio.gather(
-                    *[c(event) for c in self._callbacks[dataset].values()]
-                )
+                await asyncio.gather(*[c(event) for c in callbacks.values()])
             except Exception as e:
                 _LOGGER.error(
-                    f"Error handling notification message for {dataset}: {str(e)}"
+                    "Error handling notification message for %s: %s", dataset, e
                 )
 
     async def disconnect(self):
@@ -1,36 +1,85 @@
 import aiohttp
+from aiohttp import hdrs
 import asyncio
 import io
 import logging
+from random import random
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from types import MappingProxyType
 
-from .helpers import format_dt
-
-BASE_URL = "https://api.dataplatform.knmi.nl/wms/adaguc-server"
-BASE_PARAMS = {
-    "SERVICE": "WMS",
-    "REQUEST": "GetMap",
-    "VERSION": "1.3.0",
-    "FORMAT": "image/png",
-    "TRANSPARENT": "TRUE",
-    "CRS": "EPSG:3857",
-}
+from yarl import URL
+
+from .helpers import error_body, format_dt
+
+# Parsed once, instead of by aiohttp for every request
+BASE_URL = URL("https://api.dataplatform.knmi.nl/wms/adaguc-server")
+# Read-only, every request merges it into its own dict
+BASE_PARAMS = MappingProxyType(
+    {
+        "SERVICE": "WMS",
+        "REQUEST": "GetMap",
+        "VERSION": "1.3.0",
+        "FORMAT": "image/png",
+        "TRANSPARENT": "TRUE",
+        "CRS": "EPSG:3857",
+    }
+)
 # This is lower than the reported 20, but staying on the safe side
 RATE_LIMIT_PER_SECOND = 15
+# Requests running at the same time, the rate limit above still applies
+MAX_CONCURRENT_REQUESTS = 4
+# Transient errors are retried with a short backoff, to fit in the camera's time budget
+REQUEST_ATTEMPTS = 3
+RETRY_STATUSES = (502, 503, 504)
+# Don't let a stalled connection hold on to a request slot for minutes
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5, sock_read=10)
+# Enough for the frames of one radar animation
+IMAGE_CACHE_SIZE = 24
+# Considerably smaller than PNG for the radar images
+IMAGE_FORMAT_WEBP = "image/webp"
+IMAGE_FORMAT_PNG = "image/png"
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class WMS:
+    __slots__ = (
+        "_session",
+        "_headers",
+        "_semaphore",
+        "lock",
+        "last_call",
+        "_image_cache",
+        "_image_format",
+        "_in_flight",
+        "_validated",
+    )
+
     _session: aiohttp.ClientSession
 
-    def __init__(self, aiohttp_session, token):
+    def __init__(
+        self,
+        aiohttp_session,
+        token,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        prefer_webp: bool = False,
+    ):
         self._session = aiohttp_session
-        self._token = token
+        # The same for every request
+        self._headers = {hdrs.AUTHORIZATION: token}
         # This limits the amount of simultaneous requests
-        self._semaphore = asyncio.Semaphore(1)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
         self.lock = asyncio.Lock()
         self.last_call = 0
+        self._image_cache: OrderedDict[tuple, bytes] = OrderedDict()
+        # Falls back to PNG when the server doesn't produce WebP
+        self._image_format = IMAGE_FORMAT_WEBP if prefer_webp else IMAGE_FORMAT_PNG
+        # Requests that are currently running, to be shared by identical requests
+        self._in_flight: dict[tuple, asyncio.Task[bytes]] = {}
+        # Validators (ETag, Last-Modified) and body of responses that are requested
+        # conditionally, so an unchanged response doesn't need to be transferred again
+        self._validated: dict[tuple, tuple[str | None, str | None, bytes]] = {}
 
     async def wait_for_rate(self):
         async with self.lock:
@@ -40,73 +89,175 @@ class WMS:
                 await asyncio.sleep(wait)
             self.last_call = asyncio.get_event_loop().time()
 
-    async def get(self, params):
-        headers = {"Authorization": self._token}
+    async def get(self, params, conditional: bool = False) -> bytes:
+        key = tuple(sorted(params.items()))
+        if (task := self._in_flight.get(key)) is None:
+            task = asyncio.create_task(
+                self._request(params, key if conditional else None)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded, so a cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _request(self, params, conditional_key: tuple | None = None) -> bytes:
+        for attempt in range(REQUEST_ATTEMPTS - 1):
+            try:
+                return await self._request_once(params, conditional_key)
+            except (
+                ServerUnavailable,
+                aiohttp.ClientConnectionError,
+                asyncio.TimeoutError,
+            ) as e:
+                _LOGGER.debug("Retrying WMS request due to error: %r", e)
+                await asyncio.sleep(0.5 * 2**attempt + random() * 0.25)
+        # Last attempt, any error goes to the caller
+        return await self._request_once(params, conditional_key)
+
+    async def _request_once(self, params, conditional_key: tuple | None) -> bytes:
+        headers = self._headers
+        validated = self._validated.get(conditional_key)
+        if validated is not None:
+            etag, last_modified, _ = validated
+            headers = headers.copy()
+            if etag is not None:
+                headers[hdrs.IF_NONE_MATCH] = etag
+            if last_modified is not None:
+                headers[hdrs.IF_MODIFIED_SINCE] = last_modified
         await self.wait_for_rate()
         async with self._semaphore:
             async with self._session.get(
-                f"{BASE_URL}", headers=headers, params=params
+                BASE_URL, headers=headers, params=params, timeout=REQUEST_TIMEOUT
             ) as resp:
-                cache = resp.headers.get("adaguc-cache", "unknown")
-                age = resp.headers.get("age", "unknown")
                 _LOGGER.debug(
-                    f"Called WMS endpoint (status: {resp.status}, cache: {cache}, age: {age}): {resp.url}"
+                    "Called WMS endpoint (status: %s, cache: %s, age: %s): %s",
+                    resp.status,
+                    resp.headers.get("adaguc-cache", "unknown"),
+                    resp.headers.get("age", "unknown"),
+                    resp.url,
                 )
+                if resp.status == 304 and validated is not None:
+                    return validated[2]
                 if resp.status == 400:
-                    raise InvalidRequest(await resp.json()) from None
+                    raise InvalidRequest(await self._error_body(resp)) from None
                 if resp.status == 404:
                     raise NotFoundError("No data found for query") from None
                 elif resp.status == 403:
                     # TODO: Also handle quota exceeded
-                    raise TokenInvalid(await resp.json()) from None
+                    raise TokenInvalid(await self._error_body(resp)) from None
                 elif resp.status == 429:
                     raise RateLimitExceeded("Rate limit exceeded") from None
+                elif resp.status in RETRY_STATUSES:
+                    raise ServerUnavailable(f"Status code: {resp.status}") from None
                 elif resp.status >= 500:
                     raise ServerError(f"Status code: {resp.status}") from None
 
-                buffer = io.BytesIO(await resp.read())
+                data = await resp.read()
 
                 # TODO: Not sure this check works
-                if b"ADAGUC Server:" in buffer.readline():
-                    raise InvalidRequest(buffer.read().decode("UTF-8")) from None
-                buffer.seek(0)
+                end = data.find(b"\n")
+                if b"ADAGUC Server:" in (data if end == -1 else data[:end]):
+                    raise InvalidRequest(data[end + 1 :].decode("UTF-8")) from None
+
+                # Don't hand an error page to the image decoder
+                content_type = resp.content_type
+                is_image = content_type.startswith("image/")
+                if params.get("REQUEST") == "GetMap" and not is_image:
+                    message = data[:200].decode(errors="replace")
+                    if "xml" in content_type:
+                        # A WMS service exception
+                        raise InvalidRequest(message)
+                    raise ServerError(
+                        f"Unexpected content type {content_type}: {message}"
+                    )
+                # A server may also ignore the unsupported format, so get_image falls
+                # back to PNG on any other image type
+                requested = params.get("FORMAT")
+                if requested == IMAGE_FORMAT_WEBP and content_type != requested:
+                    raise InvalidRequest(f"Requested {requested}, got {content_type}")
+
+                if conditional_key is not None:
+                    etag = resp.headers.get(hdrs.ETAG)
+                    last_modified = resp.headers.get(hdrs.LAST_MODIFIED)
+                    if etag is not None or last_modified is not None:
+                        self._validated[conditional_key] = (etag, last_modified, data)
 
-                return buffer
+                return data
+
+    @staticmethod
+    async def _error_body(resp: aiohttp.ClientResponse):
+        """Read the body of an error response, only done when there is an error."""
+        return error_body(await resp.read())
+
+    async def get_image(self, params) -> bytes:
+        """Get a map image, from the cache if it was recently retrieved.
+
+        Images for a specific (reference) time do not change, so they can be reused
+        as long as they are part of the animation.
+        """
+        params = {**params, "FORMAT": self._image_format}
+        key = tuple(sorted(params.items()))
+        if (data := self._image_cache.get(key)) is not None:
+            self._image_cache.move_to_end(key)
+            return data
+
+        try:
+            data = await self.get(params)
+        except InvalidRequest:
+            if params["FORMAT"] == IMAGE_FORMAT_PNG:
+                raise
+            # Only stick with PNG if that does work, the request may be invalid
+            # for another reason
+            params = {**params, "FORMAT": IMAGE_FORMAT_PNG}
+            key = tuple(sorted(params.items()))
+            data = await self.get(params)
+            _LOGGER.debug("WMS does not provide WebP images, using PNG")
+            self._image_format = IMAGE_FORMAT_PNG
+
+        self._image_cache[key] = data
+        if len(self._image_cache) > IMAGE_CACHE_SIZE:
+            self._image_cache.popitem(last=False)
+        return data
 
     async def get_capabilities_radar(self) -> ET.ElementTree:
-        params = {}
-        params["SERVICE"] = "WMS"
-        params["DATASET"] = "nl_rdr_data_rtcor_5m"
-        params["REQUEST"] = "GetCapabilities"
-        buf = await self.get(params)
-        return ET.parse(buf)
+        params = {
+            "SERVICE": "WMS",
+            "DATASET": "nl_rdr_data_rtcor_5m",
+            "REQUEST": "GetCapabilities",
+        }
+        # Changes with every new radar image, but is often requested in between
+        return ET.parse(io.BytesIO(await self.get(params, conditional=True)))
 
     async def radar_real_time_image(self, time, size, bbox, style):
-        params = BASE_PARAMS.copy()
-        # The zulu "Z" format (instead of +00:00) is needed to enable long-term caching.
-        # https://github.com/KNMI/adaguc-server/issues/719
-        params["TIME"] = format_dt(time)
-        params["DATASET"] = "nl_rdr_data_rtcor_5m"
-        params["LAYERS"] = "precipitation_real_time"
-        params["STYLES"] = style
-        params["WIDTH"] = size[0]
-        params["HEIGHT"] = size[1]
-        params["BBOX"] = bbox
-        return await self.get(params)
+        params = {
+            **BASE_PARAMS,
+            # The zulu "Z" format (instead of +00:00) is needed to enable long-term
+            # caching. https://github.com/KNMI/adaguc-server/issues/719
+            "TIME": format_dt(time),
+            "DATASET": "nl_rdr_data_rtcor_5m",
+            "LAYERS": "precipitation_real_time",
+            "STYLES": style,
+            "WIDTH": size[0],
+            "HEIGHT": size[1],
+            "BBOX": bbox,
+        }
+        return await self.get_image(params)
 
     async def radar_forecast_image(self, ref_time, time, size, bbox, style):
-        params = BASE_PARAMS.copy()
-        # The zulu "Z" format (instead of +00:00) is needed to enable long-term caching.
-        # https://github.com/KNMI/adaguc-server/issues/719
-        params["DIM_REFERENCE_TIME"] = format_dt(ref_time)
-        params["TIME"] = format_dt(time)
-        params["DATASET"] = "radar_forecast_2.0"
-        params["LAYERS"] = "precipitation_nowcast"
-        params["STYLES"] = style
-        params["WIDTH"] = size[0]
-        params["HEIGHT"] = size[1]
-        params["BBOX"] = bbox
-        return await self.get(params)
+        params = {
+            **BASE_PARAMS,
+            # The zulu "Z" format (instead of +00:00) is needed to enable long-term
+            # caching. https://github.com/KNMI/adaguc-server/issues/719
+            "DIM_REFERENCE_TIME": format_dt(ref_time),
+            "TIME": format_dt(time),
+            "DATASET": "radar_forecast_2.0",
+            "LAYERS": "precipitation_nowcast",
+            "STYLES": style,
+            "WIDTH": size[0],
+            "HEIGHT": size[1],
+            "BBOX": bbox,
+        }
+        return await self.get_image(params)
 
 
 class WMSException(Exception):
@@ -125,6 +276,10 @@ class ServerError(WMSException):
     """Exception class for server error"""
 
 
+class ServerUnavailable(ServerError):
+    """Exception class for a temporarily unavailable server"""
+
+
 class InvalidRequest(WMSException):
     """Exception class for invalid request"""
 
@@ -4,9 +4,10 @@ import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_MODE, Platform
+from homeassistant.const import CONF_MODE, CONF_NAME, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 
 from .KNMI.app import App
 from .KNMI.edr import EDR
@@ -17,9 +18,11 @@ from .const import (
     CONF_EDR_API_TOKEN,
     CONF_WMS_TOKEN,
     DOMAIN as DOMAIN,
+    RADAR_DEVICE,
     StationMode,
 )
 from .coordinator import (
+    EDRFetchHub,
     NLWeatherConfigEntry,
     NLWeatherAutoEDRCoordinator,
     NLWeatherManualEDRCoordinator,
@@ -41,9 +44,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: NLWeatherConfigEntry) ->
     """Set up from a config entry."""
     _LOGGER.debug("async_setup_entry")
 
+    # Home Assistant's shared session already pools keep-alive connections and caches
+    # DNS lookups. All KNMI clients use it, so their requests reuse open connections.
     session = async_get_clientsession(hass)
     ns = NotificationService(entry.data[CONF_MQTT_TOKEN])
     edr = EDR(session, entry.data[CONF_EDR_API_TOKEN])
+    edr_hub = EDRFetchHub(ns, edr)
     entry.async_create_background_task(hass, ns.run(), "NotificationService")
 
     entry.runtime_data = RuntimeData(
@@ -54,9 +60,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: NLWeatherConfigEntry) ->
         app_coordinators={},
         nowcast_coordinators={},
         edr_coordinators={},
+        device_infos={
+            RADAR_DEVICE: DeviceInfo(
+                name="Neerslagradar",
+                entry_type=DeviceEntryType.SERVICE,
+                identifiers={(DOMAIN, f"{entry.entry_id}_{RADAR_DEVICE}")},
+                manufacturer="KNMI.nl",
+                configuration_url="https://www.knmi.nl",
+            )
+        },
     )
 
     for subentry_id, subentry in entry.subentries.items():
+        # Shared by all entities of this location, on all platforms
+        entry.runtime_data.device_infos[subentry_id] = DeviceInfo(
+            identifiers={(DOMAIN, f"{entry.entry_id}_{subentry_id}")},
+            name=f"Weer {subentry.data[CONF_NAME]}",
+            entry_type=DeviceEntryType.SERVICE,
+            manufacturer="KNMI.nl",
+            model="Waarnemingen, verwachtingen & waarschuwingen",
+            configuration_url="https://www.knmi.nl",
+        )
         entry.runtime_data.app_coordinators[subentry_id] = NLWeatherUpdateCoordinator(
             hass, entry, subentry
         )
@@ -65,11 +89,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: NLWeatherConfigEntry) ->
         )
         if subentry.data[CONF_MODE] == StationMode.AUTO:
             entry.runtime_data.edr_coordinators[subentry_id] = (
-                NLWeatherAutoEDRCoordinator(hass, subentry, ns, edr)
+                NLWeatherAutoEDRCoordinator(hass, subentry, edr_hub)
             )
         elif subentry.data[CONF_MODE] == StationMode.MANUAL:
             entry.runtime_data.edr_coordinators[subentry_id] = (
-                NLWeatherManualEDRCoordinator(hass, subentry, ns, edr)
+                NLWeatherManualEDRCoordinator(hass, subentry, edr_hub)
             )
 
     await asyncio.gather(
@@ -5,7 +5,7 @@ from __future__ import annotations
 import asyncio
 import io
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 import logging
 from random import randint
 from PIL import Image, ImageDraw
@@ -15,17 +15,16 @@ from .KNMI.wms import WMSException
 from homeassistant.components.camera import Camera
 from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo, DeviceEntryType
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.util import dt as dt_util
 
-from .coordinator import NLWeatherConfigEntry
-from .KNMI.helpers import Coordinate, epsg4325_to_epsg3857
+from .coordinator import NLWeatherConfigEntry, device_key
+from .KNMI.helpers import Coordinate, datetime_from_filename, epsg4325_to_epsg3857
 from .const import (
     CONF_MARK_LOCATIONS,
     CONF_RADAR_STYLE,
     DEFAULT_RADAR_STYLE,
-    DOMAIN,
+    RADAR_DEVICE,
     RADAR_STYLES,
     RadarStyle,
 )
@@ -61,7 +60,7 @@ class PrecipitationRadarCam(Camera):
     _last_modified: datetime | None = None
     _loading = False
     _mark_locations = True
-    _locations = []
+    _locations: list[Coordinate]
 
     def __init__(self, config_entry: NLWeatherConfigEntry) -> None:
         super().__init__()
@@ -71,15 +70,9 @@ class PrecipitationRadarCam(Camera):
         # time, and that all readers are notified after this request completes.
         self._condition = asyncio.Condition()
 
-        self._attr_unique_id = f"{config_entry.entry_id}_precipitation_radar"
-
-        self._attr_device_info = DeviceInfo(
-            name="Neerslagradar",
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_precipitation_radar")},
-            manufacturer="KNMI.nl",
-            configuration_url="https://www.knmi.nl",
-        )
+        device_info = config_entry.runtime_data.device_infos[RADAR_DEVICE]
+        self._attr_unique_id = device_key(device_info)
+        self._attr_device_info = device_info
         self._attr_translation_key = "precipitation_radar"
 
         self._ns = config_entry.runtime_data.notification_service
@@ -92,7 +85,7 @@ class PrecipitationRadarCam(Camera):
         self._mark_locations = config_entry.options.get(CONF_MARK_LOCATIONS, True)
 
         # TODO: Deal with adding/removing location
-        self._locations: list[Coordinate] = []
+        self._locations = []
         for s in config_entry.subentries.values():
             self._locations.append(
                 Coordinate(s.data[CONF_LATITUDE], s.data[CONF_LONGITUDE])
@@ -172,7 +165,7 @@ class PrecipitationRadarCam(Camera):
                 self._radar_style.wms_style,
             )
 
-        pending_tasks: dict[asyncio.Task[tuple[datetime, io.BytesIO]], datetime] = {}
+        pending_tasks: dict[asyncio.Task[tuple[datetime, bytes]], datetime] = {}
         # Fetch images from previous hour
         time = ref_time - timedelta(minutes=60)
         while time < ref_time:
@@ -196,9 +189,9 @@ class PrecipitationRadarCam(Camera):
             async with asyncio.timeout(7):
                 for completed_task in asyncio.as_completed(pending_tasks.keys()):
                     try:
-                        img_time, buf = await completed_task
+                        img_time, data = await completed_task
                         time_to_image[img_time] = self._process_radar_frame(
-                            buf, img_time, ref_time
+                            data, img_time, ref_time
                         )
                     except (WMSException, asyncio.TimeoutError) as e:
                         _LOGGER.warning("Error processing radar image: %s", e)
@@ -219,10 +212,13 @@ class PrecipitationRadarCam(Camera):
         return time_to_image
 
     def _process_radar_frame(
-        self, buf: io.BytesIO, img_time: datetime, ref_time: datetime
+        self, data: bytes, img_time: datetime, ref_time: datetime
     ) -> Image.Image:
-        img = Image.open(buf, formats=["PNG"]).convert("RGBA")
-        del buf
+        img = Image.open(io.BytesIO(data), formats=["WEBP", "PNG"])
+        # Converting always makes a copy, even when the mode is the same
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        del data
 
         draw = ImageDraw.Draw(img)
         draw.text(
@@ -289,7 +285,7 @@ class PrecipitationRadarCam(Camera):
 
         for dim in root.findall(".//{*}Dimension[@name='time']"):
             start, end, period = dim.text.strip().split("/")
-            return datetime.fromisoformat(end.replace("Z", "+00:00"))
+            return datetime.fromisoformat(end)
         return None
 
     async def async_camera_image(
@@ -333,9 +329,9 @@ class PrecipitationRadarCam(Camera):
     async def _set_latest(self, event):
         # Allowing for some time for the image to be available in WMS, plus some jitter time to allow to hit the cache more often
         await asyncio.sleep(15 + randint(0, 10))
-        self._last_modified = datetime.strptime(
-            event["data"]["filename"], "RAD_NL25_RAC_FM_%Y%m%d%H%M.h5"
-        ).replace(tzinfo=timezone.utc)
+        self._last_modified = datetime_from_filename(
+            event["data"]["filename"], "RAD_NL25_RAC_FM_"
+        )
 
     async def async_added_to_hass(self):
         self._ns.set_callback("radar_forecast", self._attr_unique_id, self._set_latest)
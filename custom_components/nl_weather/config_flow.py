@@ -311,6 +311,11 @@ class LocationSubentryFlowHandler(ConfigSubentryFlow):
         )
 
     async def async_step_manual(self, user_input=None):
+        if user_input is not None:
+            data = {**self._data, **user_input}
+            return self.async_create_entry(data=data, title=data[CONF_NAME])
+
+        # The stations are only needed to show the form, not when it is submitted
         session = async_get_clientsession(self.hass)
         edr = EDR(session, self._get_entry().data[CONF_EDR_API_TOKEN])
         locations = await edr.locations()
@@ -326,10 +331,6 @@ class LocationSubentryFlowHandler(ConfigSubentryFlow):
             key=lambda o: o["label"],
         )
 
-        if user_input is not None:
-            data = {**self._data, **user_input}
-            return self.async_create_entry(data=data, title=data[CONF_NAME])
-
         return self.async_show_form(
             step_id="manual",
             data_schema=vol.Schema(
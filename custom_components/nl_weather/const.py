@@ -120,6 +120,7 @@ PARAMETER_ATTRIBUTE_MAP = {
     ATTR_WEATHER_CLOUD_CEILING: "hc",
     ATTR_WEATHER_TEMPERATURE_SOIL: "tb2",
 }
+PARAMETERS = tuple(PARAMETER_ATTRIBUTE_MAP.values())
 
 # Based on https://gitlab.com/KNMI-OSS/KNMI-App/knmi-app-android/-/blob/main/app/src/main/assets/alert_regions_simplified.geojson
 ALERT_REGIONS = {
@@ -142,6 +143,8 @@ ALERT_REGIONS = {
 
 APP_FORECAST_API_SCAN_INTERVAL = timedelta(minutes=15)
 APP_NOWCAST_API_SCAN_INTERVAL = timedelta(minutes=5)
+# Day details change less often than the summary, so are refreshed less often
+APP_DAY_DETAIL_MAX_AGE = timedelta(hours=1)
 
 # Based on https://gitlab.com/KNMI-OSS/KNMI-App/knmi-app-api/-/blob/main/app/helpers/weather.ts
 # And https://gitlab.com/KNMI-OSS/KNMI-App/knmi-app-android/-/blob/main/app/src/main/java/nl/knmi/weer/util/WeatherTypeExtension.kt
@@ -230,6 +233,9 @@ RADAR_STYLES: dict[str, RadarStyle] = {
 
 DEFAULT_RADAR_STYLE = "light"
 
+# Key of the radar device in RuntimeData.device_infos, next to the subentry ids
+RADAR_DEVICE = "precipitation_radar"
+
 
 class StationMode(StrEnum):
     AUTO = "auto"
@@ -1,26 +1,32 @@
 from __future__ import annotations
 import asyncio
+from bisect import bisect_left
+from collections.abc import Callable
 from dataclasses import dataclass
 import logging
 from datetime import datetime, timezone
-from random import randint
+from random import uniform
+from time import monotonic
 from math import floor
 from typing import Any
 
 from homeassistant.config_entries import ConfigSubentry
 from homeassistant.const import CONF_NAME, CONF_LATITUDE, CONF_LONGITUDE, CONF_REGION
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import utcnow
 
 from .const import (
+    Alert,
+    APP_DAY_DETAIL_MAX_AGE,
     APP_FORECAST_API_SCAN_INTERVAL,
     CONF_STATION,
-    PARAMETER_ATTRIBUTE_MAP,
+    PARAMETERS,
     APP_NOWCAST_API_SCAN_INTERVAL,
 )
-from .KNMI.edr import EDR, NotFoundError, ServerError
+from .KNMI.edr import EDR, Coverage, NotFoundError, ServerError
 from .KNMI.app import App, AppException
 from .KNMI.notification_service import NotificationService
 from .KNMI.wms import WMS
@@ -29,12 +35,29 @@ from .KNMI.helpers import (
     Coordinate,
     format_dt,
     coverage_distance,
+    datetime_from_filename,
     sort_coverages_on_distance,
+    most_frequent,
     unique_items_sorted_by_frequency,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+_ALERT_LEVELS = {a.value: a for a in Alert}
+
+# New observations are usually queryable in EDR within seconds of the notification.
+# Retry with an exponential backoff (2, 4, 8, 15, 15 seconds), together still
+# allowing for about as long as before for slow updates.
+EDR_FETCH_ATTEMPTS = 5
+EDR_FETCH_MAX_DELAY = 15  # seconds
+# Random extra delay for every attempt, spreading the requests of all installations
+EDR_FETCH_JITTER = 5  # seconds
+# Repeated notifications of the same file within this time are ignored
+EDR_DUPLICATE_NOTIFICATION_WINDOW = 60  # seconds
+# Station names are only looked up again when an unknown station shows up, but not
+# more often than this
+STATION_NAMES_MIN_INTERVAL = 3600  # seconds
+
 
 @dataclass
 class RuntimeData:
@@ -45,11 +68,18 @@ class RuntimeData:
     app_coordinators: dict[str, NLWeatherUpdateCoordinator]
     nowcast_coordinators: dict[str, NLWeatherNowcastCoordinator]
     edr_coordinators: dict[str, NLWeatherEDRCoordinator]
+    device_infos: dict[str, DeviceInfo]
 
 
 type NLWeatherConfigEntry = ConfigEntry[RuntimeData]
 
 
+def device_key(device_info: DeviceInfo) -> str:
+    """Return the key of a device, which prefixes the unique ids of its entities."""
+    ((_, key),) = device_info["identifiers"]
+    return key
+
+
 class NLWeatherUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Coordinator for NL Weather forecast data."""
 
@@ -73,6 +103,8 @@ class NLWeatherUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             subentry.data[CONF_LONGITUDE],
         )
         self._region = subentry.data[CONF_REGION]
+        # Day details per date, with the monotonic time they were retrieved
+        self._day_details: dict[str, tuple[float, dict[str, Any]]] = {}
 
     async def _async_setup(self) -> None:
         # Calculate grid cells for this location
@@ -81,16 +113,31 @@ class NLWeatherUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             GridDefinitions.FORECAST, self._location
         )
 
+    async def _get_day_detail(self, date: str) -> dict[str, Any]:
+        now = monotonic()
+        cached = self._day_details.get(date)
+        max_age = APP_DAY_DETAIL_MAX_AGE.total_seconds()
+        if cached is not None and now - cached[0] < max_age:
+            return cached[1]
+
+        day_detail = await self._api.weather_detail(
+            self._forecast_cell, self._region, date
+        )
+        self._day_details[date] = (now, day_detail)
+        return day_detail
+
     async def _async_update_data(self) -> dict[str, Any]:
         """Obtain the latest data from KNMI App API."""
         try:
             summary = await self._api.weather(self._forecast_cell, self._region)
 
             # Fetch all individual days
+            dates = [d["date"] for d in summary["daily"]["forecast"]]
+            self._day_details = {
+                d: v for d, v in self._day_details.items() if d in dates
+            }
             for daily_forecast in summary["daily"]["forecast"]:
-                day_detail = await self._api.weather_detail(
-                    self._forecast_cell, self._region, daily_forecast["date"]
-                )
+                day_detail = await self._get_day_detail(daily_forecast["date"])
                 # Augment the summary data with daily data
                 daily_forecast["precipitation"]["chance"] = day_detail[
                     "precipitationChance"
@@ -107,15 +154,45 @@ class NLWeatherUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             raise UpdateFailed(f"Error while retrieving data: {err}") from err
 
         # Prune hours that already passed from the data, this is way more convenient to do here already
+        # The hours are in chronological order, so only a few of them need parsing
         current_hour = utcnow().replace(minute=0, second=0, microsecond=0)
-        summary["hourly"]["forecast"] = [
-            h
-            for h in summary["hourly"]["forecast"]
-            if datetime.fromisoformat(h["dateTime"]) >= current_hour
-        ]
+        hourly = summary["hourly"]["forecast"]
+        first = bisect_left(
+            hourly, current_hour, key=lambda h: datetime.fromisoformat(h["dateTime"])
+        )
+        summary["hourly"]["forecast"] = hourly[first:]
+
+        # Used by both the alert level sensor and the alert binary sensor
+        summary["alert_level"] = self._get_alert_level(summary)
+        # Used by the alert, alert count sensors and their attributes
+        summary["parsed_alerts"] = self._get_alerts(summary)
 
         return summary
 
+    @staticmethod
+    def _get_alerts(summary: dict[str, Any]) -> list[dict[str, str]]:
+        alerts = []
+        for alert in summary.get("alerts", []):
+            if not isinstance(alert, dict):
+                continue
+            description = alert.get("description")
+            if not isinstance(description, str) or not description.strip():
+                continue
+            # Skip alerts with an unknown level, instead of failing the whole update
+            if (level := _ALERT_LEVELS.get(alert.get("level"))) is None:
+                _LOGGER.debug("Unknown alert level: %s", alert.get("level"))
+                continue
+            alerts.append({"code": level.value, "description": description.strip()})
+        return alerts
+
+    @staticmethod
+    def _get_alert_level(summary: dict[str, Any]) -> Alert:
+        # TODO: Is the first alert always the highest?
+        hours = summary["hourly"]["forecast"]
+        if not hours:
+            return Alert.NONE
+        return _ALERT_LEVELS.get(hours[0].get("alertLevel"), Alert.NONE)
+
 
 class NLWeatherNowcastCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
     """Coordinator for NL Weather precipitation nowcast data."""
@@ -144,12 +221,10 @@ class NLWeatherNowcastCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
 
     def _get_precipitation_nowcast(self, precipitation_graph):
         """Get 5 minute weather data from the forecast."""
+        precipitation = precipitation_graph["precipitation"]
         return [
-            {
-                "datetime": datetime.fromisoformat(time),
-                "precipitation": precipitation_graph["precipitation"]["amounts"][idx],
-            }
-            for idx, time in enumerate(precipitation_graph["precipitation"]["times"])
+            {"datetime": datetime.fromisoformat(time), "precipitation": amount}
+            for time, amount in zip(precipitation["times"], precipitation["amounts"])
         ]
 
     async def _async_update_data(self) -> list[dict[str, Any]]:
@@ -169,23 +244,162 @@ class NLWeatherNowcastCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             ) from err
 
 
+class EDRFetchHub:
+    """Fetches the EDR observations once per notification for all EDR coordinators"""
+
+    def __init__(self, ns: NotificationService, edr: EDR) -> None:
+        self._ns = ns
+        self._edr = edr
+        self._setup_lock = asyncio.Lock()
+        self._is_setup = False
+        self._listeners: dict[str, Callable[[dict[str, Coverage]], None]] = {}
+        self._latest_filename_datetime = datetime(
+            year=1970, month=1, day=1, hour=0, minute=0, second=0, tzinfo=timezone.utc
+        )
+        # Monotonic time of the last successful fetch
+        self._last_fetch = 0.0
+        self.station_names: dict[str, str] = {}
+        self._station_names_fetched = 0.0
+        # Shared by all that need the station names at the same time
+        self._station_names_task: asyncio.Task[None] | None = None
+        # Latest coverages by station id, indexed once for all coordinators
+        self.coverages: dict[str, Coverage] = {}
+
+    def add_listener(
+        self, identifier: str, listener: Callable[[dict[str, Coverage]], None]
+    ) -> None:
+        self._listeners[identifier] = listener
+
+    async def async_setup(self) -> None:
+        """Set up once, no matter how many coordinators are waiting for it."""
+        async with self._setup_lock:
+            if self._is_setup:
+                return
+
+            self._latest_filename_datetime = await self._edr.get_latest_datetime()
+
+            # Cache all station names
+            await self._update_station_names()
+
+            # Get some initial observation data
+            self.coverages = self._index_coverages(
+                await self._edr.get_cube_coverages(
+                    self._latest_filename_datetime, PARAMETERS
+                )
+            )
+
+            # TODO: Handle removal of this callback
+            self._ns.set_callback(
+                "10-minute-in-situ-meteorological-observations",
+                "edr",
+                self.get_coverage_datetime,
+            )
+            self._is_setup = True
+
+    async def _update_station_names(self) -> None:
+        task = self._station_names_task
+        if task is None or task.done():
+            task = self._station_names_task = asyncio.create_task(
+                self._fetch_station_names()
+            )
+        await asyncio.shield(task)
+
+    async def _fetch_station_names(self) -> None:
+        stations = await self._edr.locations()
+        self.station_names = {
+            feature["id"]: feature["properties"]["name"]
+            for feature in stations["features"]
+        }
+        self._station_names_fetched = monotonic()
+
+    async def _update_unknown_station_names(self, coverages: list[Coverage]) -> None:
+        if all(c.location_id in self.station_names for c in coverages):
+            return
+        if monotonic() - self._station_names_fetched < STATION_NAMES_MIN_INTERVAL:
+            return
+        _LOGGER.debug("Found unknown stations, updating station names")
+        # Best effort, the observations are still used with the known names
+        try:
+            await self._update_station_names()
+        except Exception as e:
+            _LOGGER.debug("Could not update station names: %r", e)
+
+    @staticmethod
+    def _index_coverages(coverages: list[Coverage]) -> dict[str, Coverage]:
+        return {c.location_id: c for c in coverages}
+
+    async def get_coverage_datetime(self, event) -> None:
+        filename_datetime = datetime_from_filename(
+            event["data"]["filename"], "KMDS__OPER_P___10M_OBS_L2_"
+        )
+
+        if filename_datetime < self._latest_filename_datetime:
+            _LOGGER.debug(
+                f"Already got coverage later than datetime: {filename_datetime}"
+            )
+            return
+
+        # The same file may be notified multiple times in quick succession
+        if (
+            filename_datetime == self._latest_filename_datetime
+            and monotonic() - self._last_fetch < EDR_DUPLICATE_NOTIFICATION_WINDOW
+        ):
+            _LOGGER.debug("Just got coverage for datetime: %s", filename_datetime)
+            return
+
+        _LOGGER.debug(f"Fetch EDR coverage for datetime: {filename_datetime}")
+        for attempt in range(EDR_FETCH_ATTEMPTS):
+            # Allowing for some time for the data to be available in EDR, plus some
+            # jitter time
+            delay = min(2 * 2**attempt, EDR_FETCH_MAX_DELAY)
+            await asyncio.sleep(delay + uniform(0, EDR_FETCH_JITTER))
+            try:
+                coverages = await self._edr.get_cube_coverages(
+                    filename_datetime, PARAMETERS
+                )
+            except (NotFoundError, ServerError) as e:
+                _LOGGER.debug(f"Retrying fetching EDR coverage due to error: {e}")
+                continue
+
+            # The cube covers the past half hour, so it is also found when the new file
+            # is not available in EDR yet. It then only has the previous values.
+            if not coverages or max(c.time for c in coverages) < filename_datetime:
+                _LOGGER.debug(
+                    "EDR coverage for %s not available yet, retrying", filename_datetime
+                )
+                continue
+
+            self._latest_filename_datetime = filename_datetime
+            self._last_fetch = monotonic()
+            await self._update_unknown_station_names(coverages)
+            self.coverages = self._index_coverages(coverages)
+            for identifier, listener in self._listeners.items():
+                # One failing coordinator should not keep the others from updating
+                try:
+                    listener(self.coverages)
+                except Exception:
+                    _LOGGER.exception("Error handling EDR coverages for %s", identifier)
+            return
+        _LOGGER.warning(
+            f"Could not retrieve latest cube coverage at {filename_datetime} after {EDR_FETCH_ATTEMPTS} attempts"
+        )
+
+
 class NLWeatherEDRCoordinator(DataUpdateCoordinator):
-    """Base EDR Coordinator"""
+    """Base EDR Coordinator
 
-    _latest_filename_datetime = datetime(
-        year=1970, month=1, day=1, hour=0, minute=0, second=0, tzinfo=timezone.utc
-    )
-    _station_names = {}
+    Subclasses implement _handle_coverages, which gets the latest coverages of all
+    stations by station id.
+    """
 
-    def __init__(self, hass, subentry: ConfigSubentry, ns, edr) -> None:
+    def __init__(self, hass, subentry: ConfigSubentry, hub: EDRFetchHub) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name=f"NL Weather EDR API data coordinator for {subentry.data[CONF_NAME]}",
             update_interval=None,  # no polling
         )
-        self._ns = ns
-        self._edr = edr
+        self._hub = hub
         self._config = subentry.data
         self._subentry = subentry
 
@@ -194,178 +408,131 @@ class NLWeatherEDRCoordinator(DataUpdateCoordinator):
             self._config[CONF_LONGITUDE],
         )
 
-    async def get_coverage_datetime(self, event) -> None:
-        pass
+    @callback
+    def _set_data(self, data) -> None:
+        # Several notifications can lead to the same observations, e.g. when a station
+        # did not report new values. Don't make all entities write the same state again.
+        if data == self.data:
+            _LOGGER.debug("Observations for %s did not change", self.name)
+            return
+        self.async_set_updated_data(data)
 
     async def _async_update_data(self):
         """No polling. Just return the already available data."""
         return self.data
 
     async def _async_setup(self):
-        self._latest_filename_datetime = await self._edr.get_latest_datetime()
-
-        # TODO: Handle removal of this callback
-        self._ns.set_callback(
-            "10-minute-in-situ-meteorological-observations",
-            self._subentry.subentry_id,
-            self.get_coverage_datetime,
-        )
+        await self._hub.async_setup()
+        self._hub.add_listener(self._subentry.subentry_id, self._handle_coverages)
 
-        # Cache all station names
-        stations = await self._edr.locations()
-        for feature in stations["features"]:
-            self._station_names[feature["id"]] = feature["properties"]["name"]
+        # Get some initial observation data
+        self._handle_coverages(self._hub.coverages)
 
 
 class NLWeatherAutoEDRCoordinator(NLWeatherEDRCoordinator):
     """Coordinator that gets the closest values for a specific location from a mix of weather stations"""
 
+    def __init__(self, hass, subentry: ConfigSubentry, hub: EDRFetchHub) -> None:
+        super().__init__(hass, subentry, hub)
+        # Stations sorted on distance, only re-sorted when the set of stations changes
+        self._station_ids: tuple[str, ...] = ()
+        self._sorted_stations: list[tuple[str, float | None]] = []
+
+    def _sort_coverages(self, by_id):
+        station_ids = tuple(by_id)
+        if station_ids == self._station_ids:
+            return [(by_id[s], d) for s, d in self._sorted_stations]
+
+        sorted_coverages = sort_coverages_on_distance(
+            list(by_id.values()), self._location
+        )
+        self._station_ids = station_ids
+        self._sorted_stations = [(c.location_id, d) for c, d in sorted_coverages]
+        return sorted_coverages
+
     def _prepare_data(self, coverages):
-        sorted_coverages = sort_coverages_on_distance(coverages, self._location)
+        sorted_coverages = self._sort_coverages(coverages)
 
-        data = {"params": {}, "datetime": None, "station_name": ""}
+        data = {"params": {}, "datetime": None, "station_name": "", "distance": None}
         stations, distances, datetimes = [], [], []
 
-        for param in PARAMETER_ATTRIBUTE_MAP.values():
-            for coverage, distance in sorted_coverages:
+        # Walk the stations once, nearest first, filling in the parameters that are
+        # still missing
+        params = data["params"]
+        missing = list(PARAMETERS)
+        for coverage, distance in sorted_coverages:
+            if not missing:
+                break
+            values = coverage.values
+            still_missing = []
+            for param in missing:
                 # Not all stations have all sensors
-                if param not in coverage["ranges"]:
+                if param not in values:
+                    still_missing.append(param)
                     continue
-                data["params"][param] = coverage["ranges"][param]["values"][-1]
+                params[param] = values[param]
                 # The value may be null for this station
-                if data["params"][param] is None:
-                    continue
-                stations.append(coverage["eumetnet:locationId"])
-                distances.append(distance)
-                datetimes.append(coverage["domain"]["axes"]["t"]["values"][-1])
-                break
-            if param not in data["params"]:
+                if params[param] is None:
+                    still_missing.append(param)
+            found = len(missing) - len(still_missing)
+            missing = still_missing
+            if not found:
+                continue
+
+            if distance is None:
+                distance = coverage_distance(coverage, self._location)
+            stations.extend([coverage.location_id] * found)
+            distances.extend([distance] * found)
+            datetimes.extend([coverage.time] * found)
+
+        for param in missing:
+            if param not in params:
                 _LOGGER.warning(f"Did not find {param} in any coverage")
 
-        if len(data["params"]) == 0:
+        if not data["params"]:
             _LOGGER.warning("Found not a single parameter in the coverages")
             return data
 
         # Prepare for display
-        data["datetime"] = datetime.fromisoformat(
-            unique_items_sorted_by_frequency(datetimes)[0]
-        )
+        data["datetime"] = most_frequent(datetimes)
         data["station_name"] = ", ".join(
             list(
                 map(
-                    lambda s: self._station_names[s],
+                    lambda s: self._hub.station_names.get(s, s),
                     unique_items_sorted_by_frequency(stations),
                 )
             )
         )
-        data["distance"] = unique_items_sorted_by_frequency(distances)[0]
+        data["distance"] = most_frequent(distances)
 
         return data
 
-    async def get_coverage_datetime(self, event) -> None:
-        filename_datetime = datetime.strptime(
-            event["data"]["filename"], "KMDS__OPER_P___10M_OBS_L2_%Y%m%d%H%M.nc"
-        ).replace(tzinfo=timezone.utc)
-
-        if filename_datetime < self._latest_filename_datetime:
-            _LOGGER.debug(
-                f"Already got coverage later than datetime: {filename_datetime}"
-            )
-            return
-
-        _LOGGER.debug(f"Fetch EDR coverage for datetime: {filename_datetime}")
-        for _ in range(3):
-            # Allowing for some time for the data to be available in EDR, plus some jitter time
-            await asyncio.sleep(15 + randint(0, 10))
-            try:
-                coverages = await self._edr.get_cube_coverages(
-                    filename_datetime, PARAMETER_ATTRIBUTE_MAP.values()
-                )
-                self._latest_filename_datetime = filename_datetime
-                self.async_set_updated_data(self._prepare_data(coverages))
-                return
-            except (NotFoundError, ServerError) as e:
-                _LOGGER.debug(f"Retrying fetching EDR coverage due to error: {e}")
-                continue
-        _LOGGER.warning(
-            f"Could not retrieve latest cube coverage at {filename_datetime} after 3 attempts"
-        )
-
-    async def _async_setup(self):
-        await super()._async_setup()
-
-        # Get some initial observation data
-        coverages = await self._edr.get_cube_coverages(
-            self._latest_filename_datetime, PARAMETER_ATTRIBUTE_MAP.values()
-        )
-
-        self.async_set_updated_data(self._prepare_data(coverages))
+    @callback
+    def _handle_coverages(self, coverages) -> None:
+        self._set_data(self._prepare_data(coverages))
 
 
 class NLWeatherManualEDRCoordinator(NLWeatherEDRCoordinator):
     """Coordinator that gets data for specific weather station"""
 
-    _latest_filename_datetime = datetime(
-        year=1970, month=1, day=1, hour=0, minute=0, second=0, tzinfo=timezone.utc
-    )
-
-    def __init__(self, hass, subentry: ConfigSubentry, ns, edr) -> None:
-        super().__init__(hass, subentry, ns, edr)
+    def __init__(self, hass, subentry: ConfigSubentry, hub: EDRFetchHub) -> None:
+        super().__init__(hass, subentry, hub)
         self._station = self._config[CONF_STATION]
 
-    def _prepare_data(self, coverage):
+    def _prepare_data(self, coverage: Coverage):
         return {
-            "datetime": datetime.fromisoformat(
-                coverage["domain"]["axes"]["t"]["values"][-1]
+            "datetime": coverage.time,
+            "station_name": self._hub.station_names.get(
+                coverage.location_id, coverage.location_id
             ),
-            "station_name": self._station_names[coverage["eumetnet:locationId"]],
             "distance": coverage_distance(coverage, self._location),
-            "params": {p: i["values"][-1] for p, i in coverage["ranges"].items()},
+            "params": dict(coverage.values),
         }
 
-    async def get_coverage_datetime(self, event) -> None:
-        filename_datetime = datetime.strptime(
-            event["data"]["filename"], "KMDS__OPER_P___10M_OBS_L2_%Y%m%d%H%M.nc"
-        ).replace(tzinfo=timezone.utc)
-
-        if filename_datetime <= self._latest_filename_datetime:
-            _LOGGER.debug(
-                f"Already got coverage later than or at datetime: {filename_datetime}"
-            )
+    @callback
+    def _handle_coverages(self, coverages) -> None:
+        coverage = coverages.get(self._station)
+        if coverage is None:
+            _LOGGER.debug("Could not find coverage for %s", self._station)
             return
-
-        _LOGGER.debug(f"Fetch EDR coverage for datetime: {filename_datetime}")
-        for _ in range(3):
-            # Allowing for some time for the data to be available in EDR, plus some jitter time
-            await asyncio.sleep(15 + randint(0, 10))
-            try:
-                coverage = await self._edr.get_location_coverage(
-                    self._station, filename_datetime, PARAMETER_ATTRIBUTE_MAP.values()
-                )
-                self._latest_filename_datetime = filename_datetime
-                self.async_set_updated_data(self._prepare_data(coverage))
-                return
-            except (NotFoundError, ServerError) as e:
-                _LOGGER.debug(f"Retrying fetching EDR coverage due to error: {e}")
-                continue
-        _LOGGER.warning(
-            f"Could not retrieve coverage for {self._station} at {filename_datetime} after 3 attempts"
-        )
-
-    async def _async_setup(self):
-        await super()._async_setup()
-
-        # Get some initial observation data
-        try:
-            coverage = await self._edr.get_location_coverage(
-                self._station,
-                self._latest_filename_datetime,
-                PARAMETER_ATTRIBUTE_MAP.values(),
-            )
-            self.async_set_updated_data(self._prepare_data(coverage))
-        except NotFoundError:
-            _LOGGER.debug(
-                f"Could not fill initial data from {self._station} at {self._latest_filename_datetime}"
-            )
-            # TODO: This doesn't help yet
-            self.async_set_updated_data(None)
+        self._set_data(self._prepare_data(coverage))
@@ -1,5 +1,6 @@
 from collections.abc import Callable
 from dataclasses import dataclass, field
+from operator import itemgetter
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -11,7 +12,6 @@ from homeassistant.components.sensor import (
 from homeassistant.components.weather.significant_change import (
     VALID_CARDINAL_DIRECTIONS,
 )
-from homeassistant.config_entries import ConfigSubentry
 from homeassistant.const import (
     DEGREE,
     PERCENTAGE,
@@ -22,13 +22,12 @@ from homeassistant.const import (
     UnitOfTemperature,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN
 from .const import (
     Alert,
     ATTR_WEATHER_CLOUD_COVERAGE,
@@ -51,54 +50,31 @@ from .coordinator import (
     NLWeatherConfigEntry,
     NLWeatherEDRCoordinator,
     NLWeatherUpdateCoordinator,
+    device_key,
 )
 
 
 @dataclass(frozen=True)
-class AlertSensorDescription(SensorEntityDescription):
+class NLWeatherSensorDescription(SensorEntityDescription):
     value_fn: Callable[[dict[str, Any]], Any] | None = field(default=None, repr=False)
     extra_state_attributes_fn: Callable[[dict[str, Any]], dict[str, Any]] | None = (
         field(default=None, repr=False)
     )
 
 
-@dataclass(frozen=True)
-class ObservationSensorDescription(SensorEntityDescription):
-    value_fn: Callable[[dict[str, Any]], Any] | None = field(default=None, repr=False)
-
-
-@dataclass(frozen=True)
-class ForecastSensorDescription(SensorEntityDescription):
-    value_fn: Callable[[dict[str, Any]], Any] | None = field(default=None, repr=False)
-
-
-def _get_alerts(data: dict[str, Any]) -> list[dict[str, str]]:
-    alerts = data.get("alerts", [])
-    return [
-        {
-            "code": Alert(alert["level"]).value,
-            "description": description.strip(),
-        }
-        for alert in alerts
-        if isinstance(alert, dict)
-        and isinstance((description := alert.get("description")), str)
-        and description.strip()
-    ]
-
-
 def _get_alert_description(data: dict[str, Any]) -> str | None:
-    alerts = _get_alerts(data)
+    alerts = data["parsed_alerts"]
     if not alerts:
         return "none"
     return alerts[0]["description"]
 
 
 def _get_alert_count(data: dict[str, Any]) -> int:
-    return len(_get_alerts(data))
+    return len(data["parsed_alerts"])
 
 
 def _get_alert_attributes(data: dict[str, Any]) -> dict[str, Any]:
-    alerts = _get_alerts(data)
+    alerts = data["parsed_alerts"]
     descriptions = [alert["description"] for alert in alerts]
     return {
         "alert_count": len(alerts),
@@ -109,36 +85,48 @@ def _get_alert_attributes(data: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def _get_alert_level(data: dict[str, Any]) -> Alert:
-    # TODO: Is the first alert always the highest?
-    try:
-        return Alert(data["hourly"]["forecast"][0]["alertLevel"])
-    except (KeyError, IndexError, TypeError, ValueError):
-        return Alert.NONE
+def _observation_param(weather_attribute: str) -> Callable[[dict[str, Any]], Any]:
+    """Return a value_fn that extracts an observed parameter.
+
+    The parameter name is looked up once, instead of on every update.
+    """
+    param = PARAMETER_ATTRIBUTE_MAP[weather_attribute]
+
+    def _fn(data: dict[str, Any]) -> Any:
+        return data["params"].get(param)
+
+    return _fn
 
 
-def _get_observation_param(
-    data: dict[str, Any],
-    weather_attribute: str,
-) -> Any:
-    return data.get("params", {}).get(PARAMETER_ATTRIBUTE_MAP[weather_attribute])
+_get_cloud_coverage_okta = _observation_param(ATTR_WEATHER_CLOUD_COVERAGE)
+_get_wind_bearing = _observation_param(ATTR_WEATHER_WIND_BEARING)
+
+
+# Percentage per okta, 9 meaning the sky is obscured
+_OKTA_TO_PERCENTAGE = (*(round(okta / 8 * 100, 1) for okta in range(9)), 100)
 
 
 def _get_cloud_coverage(data: dict[str, Any]) -> float | int | None:
-    okta = _get_observation_param(data, ATTR_WEATHER_CLOUD_COVERAGE)
+    okta = _get_cloud_coverage_okta(data)
     if okta is None:
         return None
-    if okta == 9:
-        return 100
+    if okta in range(10):
+        return _OKTA_TO_PERCENTAGE[int(okta)]
     return round(okta / 8 * 100, 1)
 
 
+# Cardinal direction per quarter degree. The sector boundaries (11.25 + n * 22.5) are
+# all on a quarter degree, so this matches the per-degree calculation exactly.
+_CARDINAL_PER_QUARTER_DEGREE = tuple(
+    VALID_CARDINAL_DIRECTIONS[int((q / 4 + 11.25) / 22.5) % 16] for q in range(1440)
+)
+
+
 def _get_wind_direction_cardinal(data: dict[str, Any]) -> str | None:
-    degrees = _get_observation_param(data, ATTR_WEATHER_WIND_BEARING)
+    degrees = _get_wind_bearing(data)
     if degrees is None:
         return None
-    index = int((float(degrees) + 11.25) / 22.5) % 16
-    return VALID_CARDINAL_DIRECTIONS[index]
+    return _CARDINAL_PER_QUARTER_DEGREE[int(degrees * 4) % 1440]
 
 
 def _get_forecast_temperature(
@@ -150,107 +138,105 @@ def _get_forecast_temperature(
     """
 
     def _fn(data: dict[str, Any]) -> Any:
-        try:
-            return data["daily"]["forecast"][day_index]["temperature"][temp_key]
-        except (KeyError, IndexError, TypeError):
+        days = data.get("daily", {}).get("forecast", [])
+        if day_index >= len(days):
             return None
+        return (days[day_index].get("temperature") or {}).get(temp_key)
 
     return _fn
 
 
-ALERT_SENSOR_DESCRIPTIONS: list[AlertSensorDescription] = [
-    AlertSensorDescription(
+ALERT_SENSOR_DESCRIPTIONS: tuple[NLWeatherSensorDescription, ...] = (
+    NLWeatherSensorDescription(
         key="alert",
         translation_key="weather_alert",
         icon="mdi:weather-cloudy-alert",
         value_fn=_get_alert_description,
         extra_state_attributes_fn=_get_alert_attributes,
     ),
-    AlertSensorDescription(
+    NLWeatherSensorDescription(
         key="alert_count",
         translation_key="weather_alert_count",
         icon="mdi:counter",
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=_get_alert_count,
     ),
-    AlertSensorDescription(
+    NLWeatherSensorDescription(
         key="alert_level",
         translation_key="weather_alert_level",
         icon="mdi:alert-box",
         device_class=SensorDeviceClass.ENUM,
         options=[a.value for a in Alert],
-        value_fn=_get_alert_level,
+        value_fn=itemgetter("alert_level"),
     ),
-]
+)
 
 
-OBSERVATION_SENSOR_DESCRIPTIONS: list[ObservationSensorDescription] = [
-    ObservationSensorDescription(
+OBSERVATION_SENSOR_DESCRIPTIONS: tuple[NLWeatherSensorDescription, ...] = (
+    NLWeatherSensorDescription(
         key="temperature",
         translation_key="observations_temperature",
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         suggested_display_precision=1,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_TEMPERATURE),
+        value_fn=_observation_param(ATTR_WEATHER_TEMPERATURE),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="humidity",
         translation_key="observations_humidity",
         device_class=SensorDeviceClass.HUMIDITY,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_HUMIDITY),
+        value_fn=_observation_param(ATTR_WEATHER_HUMIDITY),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="visibility",
         translation_key="observations_visibility",
         device_class=SensorDeviceClass.DISTANCE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfLength.METERS,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_VISIBILITY),
+        value_fn=_observation_param(ATTR_WEATHER_VISIBILITY),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="pressure",
         translation_key="observations_pressure",
         device_class=SensorDeviceClass.ATMOSPHERIC_PRESSURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfPressure.HPA,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_PRESSURE),
+        value_fn=_observation_param(ATTR_WEATHER_PRESSURE),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="wind_speed",
         translation_key="observations_wind_speed",
         device_class=SensorDeviceClass.WIND_SPEED,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
         suggested_display_precision=1,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_WIND_SPEED),
+        value_fn=_observation_param(ATTR_WEATHER_WIND_SPEED),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="wind_gust",
         translation_key="observations_wind_gust",
         device_class=SensorDeviceClass.WIND_SPEED,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
         suggested_display_precision=1,
-        value_fn=lambda data: _get_observation_param(
-            data, ATTR_WEATHER_WIND_GUST_SPEED
-        ),
+        value_fn=_observation_param(ATTR_WEATHER_WIND_GUST_SPEED),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="dewpoint",
         translation_key="observations_dewpoint",
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         suggested_display_precision=1,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_DEW_POINT),
+        value_fn=_observation_param(ATTR_WEATHER_DEW_POINT),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="wind_direction",
         translation_key="observations_wind_direction",
         icon="mdi:compass-outline",
@@ -258,9 +244,9 @@ OBSERVATION_SENSOR_DESCRIPTIONS: list[ObservationSensorDescription] = [
         state_class=SensorStateClass.MEASUREMENT_ANGLE,
         native_unit_of_measurement=DEGREE,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_WIND_BEARING),
+        value_fn=_get_wind_bearing,
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="cloud_coverage",
         translation_key="observations_cloud_coverage",
         icon="mdi:cloud-percent",
@@ -269,38 +255,34 @@ OBSERVATION_SENSOR_DESCRIPTIONS: list[ObservationSensorDescription] = [
         suggested_display_precision=0,
         value_fn=_get_cloud_coverage,
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="solar_radiation",
         translation_key="observations_solar_radiation",
         device_class=SensorDeviceClass.IRRADIANCE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfIrradiance.WATTS_PER_SQUARE_METER,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(
-            data, ATTR_WEATHER_SOLAR_RADIATION
-        ),
+        value_fn=_observation_param(ATTR_WEATHER_SOLAR_RADIATION),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="sunshine",
         translation_key="observations_sunshine",
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTime.MINUTES,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_SUNSHINE),
+        value_fn=_observation_param(ATTR_WEATHER_SUNSHINE),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="temperature_grass",
         translation_key="observations_temperature_grass",
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         suggested_display_precision=1,
-        value_fn=lambda data: _get_observation_param(
-            data, ATTR_WEATHER_TEMPERATURE_GRASS
-        ),
+        value_fn=_observation_param(ATTR_WEATHER_TEMPERATURE_GRASS),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="cloud_ceiling",
         translation_key="observations_cloud_ceiling",
         icon="mdi:cloud-arrow-up",
@@ -308,95 +290,93 @@ OBSERVATION_SENSOR_DESCRIPTIONS: list[ObservationSensorDescription] = [
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfLength.FEET,
         suggested_display_precision=0,
-        value_fn=lambda data: _get_observation_param(data, ATTR_WEATHER_CLOUD_CEILING),
+        value_fn=_observation_param(ATTR_WEATHER_CLOUD_CEILING),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="temperature_soil",
         translation_key="observations_temperature_soil",
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         suggested_display_precision=1,
-        value_fn=lambda data: _get_observation_param(
-            data, ATTR_WEATHER_TEMPERATURE_SOIL
-        ),
+        value_fn=_observation_param(ATTR_WEATHER_TEMPERATURE_SOIL),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="wind_direction_cardinal",
         translation_key="observations_wind_direction_cardinal",
         device_class=SensorDeviceClass.ENUM,
         options=VALID_CARDINAL_DIRECTIONS,
         value_fn=_get_wind_direction_cardinal,
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="station_distance",
         translation_key="observations_station_distance",
         device_class=SensorDeviceClass.DISTANCE,
         entity_category=EntityCategory.DIAGNOSTIC,
         native_unit_of_measurement=UnitOfLength.KILOMETERS,
         suggested_display_precision=1,
-        value_fn=lambda data: data.get("distance"),
+        value_fn=itemgetter("distance"),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="station_name",
         translation_key="observations_station_name",
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_fn=lambda data: data.get("station_name"),
+        value_fn=itemgetter("station_name"),
     ),
-    ObservationSensorDescription(
+    NLWeatherSensorDescription(
         key="observation_time",
         translation_key="observations_time",
         device_class=SensorDeviceClass.TIMESTAMP,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_fn=lambda data: data.get("datetime"),
+        value_fn=itemgetter("datetime"),
     ),
-]
+)
 
 
-FORECAST_SENSOR_DESCRIPTIONS: list[ForecastSensorDescription] = [
-    ForecastSensorDescription(
+FORECAST_SENSOR_DESCRIPTIONS: tuple[NLWeatherSensorDescription, ...] = (
+    NLWeatherSensorDescription(
         key="forecast_today_high",
         translation_key="forecast_today_high",
         device_class=SensorDeviceClass.TEMPERATURE,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         value_fn=_get_forecast_temperature(0, "max"),
     ),
-    ForecastSensorDescription(
+    NLWeatherSensorDescription(
         key="forecast_today_low",
         translation_key="forecast_today_low",
         device_class=SensorDeviceClass.TEMPERATURE,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         value_fn=_get_forecast_temperature(0, "min"),
     ),
-    ForecastSensorDescription(
+    NLWeatherSensorDescription(
         key="forecast_tomorrow_high",
         translation_key="forecast_tomorrow_high",
         device_class=SensorDeviceClass.TEMPERATURE,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         value_fn=_get_forecast_temperature(1, "max"),
     ),
-    ForecastSensorDescription(
+    NLWeatherSensorDescription(
         key="forecast_tomorrow_low",
         translation_key="forecast_tomorrow_low",
         device_class=SensorDeviceClass.TEMPERATURE,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         value_fn=_get_forecast_temperature(1, "min"),
     ),
-    ForecastSensorDescription(
+    NLWeatherSensorDescription(
         key="heat_force_index",
         translation_key="heat_force_index",
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:sun-thermometer",
         value_fn=lambda data: data["hourly"]["forecast"][0].get("heatIndex", None),
     ),
-    ForecastSensorDescription(
+    NLWeatherSensorDescription(
         key="heat_force_index_today",
         translation_key="heat_force_index_today",
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:sun-thermometer-outline",
         value_fn=lambda data: data["daily"]["forecast"][0].get("heatIndex", None),
     ),
-]
+)
 
 
 async def async_setup_entry(
@@ -404,22 +384,19 @@ async def async_setup_entry(
     config_entry: NLWeatherConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
-    for subentry_id, subentry in config_entry.subentries.items():
-        entities = []
-        app_coordinator = config_entry.runtime_data.app_coordinators[subentry_id]
-        edr_coordinator = config_entry.runtime_data.edr_coordinators[subentry_id]
+    runtime_data = config_entry.runtime_data
+    for subentry_id in config_entry.subentries:
+        app_coordinator = runtime_data.app_coordinators[subentry_id]
+        edr_coordinator = runtime_data.edr_coordinators[subentry_id]
+        device_info = runtime_data.device_infos[subentry_id]
 
         entities = [
             *[
-                NLAlertSensor(app_coordinator, config_entry, subentry, desc)
-                for desc in ALERT_SENSOR_DESCRIPTIONS
-            ],
-            *[
-                NLForecastSensor(app_coordinator, config_entry, subentry, desc)
-                for desc in FORECAST_SENSOR_DESCRIPTIONS
+                NLWeatherSensor(app_coordinator, device_info, desc)
+                for desc in (*ALERT_SENSOR_DESCRIPTIONS, *FORECAST_SENSOR_DESCRIPTIONS)
             ],
             *[
-                NLObservationSensor(edr_coordinator, config_entry, subentry, desc)
+                NLWeatherSensor(edr_coordinator, device_info, desc)
                 for desc in OBSERVATION_SENSOR_DESCRIPTIONS
             ],
         ]
@@ -427,92 +404,58 @@ async def async_setup_entry(
         async_add_entities(entities, config_subentry_id=subentry_id)
 
 
-class NLAlertSensor(CoordinatorEntity[NLWeatherUpdateCoordinator], SensorEntity):
-    def __init__(
-        self,
-        coordinator: NLWeatherUpdateCoordinator,
-        config_entry: NLWeatherConfigEntry,
-        subentry: ConfigSubentry,
-        desc: AlertSensorDescription,
-    ) -> None:
-        super().__init__(coordinator)
-
-        self.entity_description = desc
-        self._attr_unique_id = (
-            f"{config_entry.entry_id}_{subentry.subentry_id}_{desc.key}"
-        )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_{subentry.subentry_id}")},
-        )
-        self._attr_has_entity_name = True
-        self._value_fn = desc.value_fn
-
-    @property
-    def native_value(self):
-        if self.coordinator.data is None:
-            return None
-        return self._value_fn(self.coordinator.data)
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        if (
-            self.entity_description.extra_state_attributes_fn is None
-            or self.coordinator.data is None
-        ):
-            return None
-        return self.entity_description.extra_state_attributes_fn(self.coordinator.data)
-
-
-class NLObservationSensor(CoordinatorEntity[NLWeatherEDRCoordinator], SensorEntity):
-    def __init__(
-        self,
-        coordinator: NLWeatherEDRCoordinator,
-        config_entry: NLWeatherConfigEntry,
-        subentry: ConfigSubentry,
-        desc: ObservationSensorDescription,
-    ) -> None:
-        super().__init__(coordinator)
-
-        self.entity_description = desc
-        self._attr_unique_id = (
-            f"{config_entry.entry_id}_{subentry.subentry_id}_{desc.key}"
-        )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_{subentry.subentry_id}")},
-        )
-        self._attr_has_entity_name = True
-        self._subentry_id = subentry.subentry_id
-        self._value_fn = desc.value_fn
-
-    @property
-    def native_value(self):
-        if self.coordinator.data is None:
-            return None
-        return self._value_fn(self.coordinator.data)
-
+class NLWeatherSensor(
+    CoordinatorEntity[NLWeatherUpdateCoordinator | NLWeatherEDRCoordinator],
+    SensorEntity,
+):
+    _attr_has_entity_name = True
+    entity_description: NLWeatherSensorDescription
 
-class NLForecastSensor(CoordinatorEntity[NLWeatherUpdateCoordinator], SensorEntity):
     def __init__(
         self,
-        coordinator: NLWeatherUpdateCoordinator,
-        config_entry: NLWeatherConfigEntry,
-        subentry: ConfigSubentry,
-        desc: ForecastSensorDescription,
+        coordinator: NLWeatherUpdateCoordinator | NLWeatherEDRCoordinator,
+        device_info: DeviceInfo,
+        desc: NLWeatherSensorDescription,
     ) -> None:
         super().__init__(coordinator)
 
         self.entity_description = desc
-        self._attr_unique_id = (
-            f"{config_entry.entry_id}_{subentry.subentry_id}_{desc.key}"
-        )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_{subentry.subentry_id}")},
+        self._attr_unique_id = f"{device_key(device_info)}_{desc.key}"
+        self._attr_device_info = device_info
+        self._written_state: tuple[Any, dict[str, Any] | None, bool] | None = None
+        self._update_state()
+
+    def _update_state(self) -> None:
+        # Extracted once per update, instead of on every state read
+        data = self.coordinator.data
+        desc = self.entity_description
+        if data is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = None
+            return
+        # Also runs while the entity is created, where an error would fail the
+        # setup of the whole platform. Missing data just gives an unknown state.
+        try:
+            self._attr_native_value = desc.value_fn(data)
+            self._attr_extra_state_attributes = (
+                None
+                if desc.extra_state_attributes_fn is None
+                else desc.extra_state_attributes_fn(data)
+            )
+        except (KeyError, IndexError, TypeError):
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update_state()
+        # Most updates don't change most sensors, e.g. the alerts
+        state = (
+            self._attr_native_value,
+            self._attr_extra_state_attributes,
+            self.available,
         )
-        self._attr_has_entity_name = True
-        self._value_fn = desc.value_fn
-
-    @property
-    def native_value(self):
-        if self.coordinator.data is None:
-            return None
-        return self._value_fn(self.coordinator.data)
+        if state == self._written_state:
+            return
+        self._written_state = state
+        super()._handle_coordinator_update()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import timedelta
 import logging
+from time import monotonic
 from typing import cast
 
 from homeassistant.components.weather import (
@@ -35,10 +36,9 @@ from homeassistant.const import (
     UnitOfLength,
     CONF_LATITUDE,
     CONF_LONGITUDE,
-    CONF_NAME,
 )
 from homeassistant.helpers import sun
-from homeassistant.helpers.device_registry import DeviceInfo, DeviceEntryType
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import entity_platform
 
@@ -47,9 +47,9 @@ from .coordinator import (
     NLWeatherUpdateCoordinator,
     NLWeatherNowcastCoordinator,
     NLWeatherEDRCoordinator,
+    device_key,
 )
 from .const import (
-    DOMAIN,
     CONDITION_MAP,
     PARAMETER_ATTRIBUTE_MAP,
     ATTR_WEATHER_CONDITION,
@@ -57,12 +57,36 @@ from .const import (
     NLWeatherEntityFeature,
 )
 
-from homeassistant.core import HomeAssistant, SupportsResponse
+from homeassistant.core import HomeAssistant, SupportsResponse, callback
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
 SERVICE_GET_MINUTE_FORECAST = "get_minute_forecast"
+SUN_CHECK_INTERVAL = 60  # seconds
+# Minutes within a 5 minute nowcast value
+MINUTE_OFFSETS = tuple(timedelta(minutes=m) for m in range(5))
+# Condition for a cloudy condition code, indexed on [windy][cloud coverage level], with
+# levels up to 25%, up to 75% and above
+CLOUDY_CONDITIONS = (
+    (ATTR_CONDITION_SUNNY, ATTR_CONDITION_PARTLYCLOUDY, ATTR_CONDITION_CLOUDY),
+    (ATTR_CONDITION_WINDY, ATTR_CONDITION_WINDY, ATTR_CONDITION_WINDY_VARIANT),
+)
 _LOGGER = logging.getLogger(__name__)
 
+# Unknown condition codes that were already logged
+_unknown_conditions: set = set()
+
+
+def _log_unknown_condition(code) -> None:
+    if code not in _unknown_conditions:
+        _unknown_conditions.add(code)
+        _LOGGER.warning(f"Unknown condition: {code}")
+
+
+def _forecast_condition(weather_type: str) -> str | None:
+    if (condition := CONDITION_FORECAST_MAP.get(weather_type)) is None:
+        _log_unknown_condition(weather_type)
+    return condition
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -77,18 +101,19 @@ async def async_setup_entry(
         supports_response=SupportsResponse.ONLY,
     )
 
+    runtime_data = config_entry.runtime_data
     for subentry_id, subentry in config_entry.subentries.items():
+        device_info = runtime_data.device_infos[subentry_id]
         entities = [
             NLWeatherForecast(
-                config_entry.runtime_data.app_coordinators[subentry_id],
-                config_entry.runtime_data.nowcast_coordinators[subentry_id],
-                config_entry,
+                runtime_data.app_coordinators[subentry_id],
+                runtime_data.nowcast_coordinators[subentry_id],
+                device_info,
                 subentry,
             ),
             NLWeatherObservations(
-                config_entry.runtime_data.edr_coordinators[subentry_id],
-                config_entry,
-                subentry,
+                runtime_data.edr_coordinators[subentry_id],
+                device_info,
             ),
         ]
         async_add_entities(
@@ -101,29 +126,41 @@ class NLWeatherObservations(CoordinatorEntity[NLWeatherEDRCoordinator], WeatherE
     _attr_should_poll = False
     _attr_attribution = "Meteorological observations provided by Koninklijk Nederlands Meteorologisch Instituut (KNMI) licensed under CC-BY 4.0"
     _attr_has_entity_name = True
-    _latest_coverage = None
+    _attr_translation_key = "observations"
+    _attr_native_wind_speed_unit = UnitOfSpeed.METERS_PER_SECOND
+    _attr_native_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_native_visibility_unit = UnitOfLength.METERS
+    _values: dict[str, float | None]
 
     def __init__(
         self,
         coordinator: NLWeatherEDRCoordinator,
-        config_entry: NLWeatherConfigEntry,
-        subentry: ConfigSubentry,
+        device_info: DeviceInfo,
     ) -> None:
         super().__init__(coordinator)
-        self._attr_unique_id = (
-            f"{config_entry.entry_id}_{subentry.subentry_id}_observations"
-        )
-
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_{subentry.subentry_id}")},
+        self._attr_unique_id = f"{device_key(device_info)}_observations"
+        self._attr_device_info = device_info
+        self._sun_up = False
+        self._sun_checked = float("-inf")
+        self._update_values()
+
+    def _update_values(self) -> None:
+        # Map the observed parameters to weather attributes once per update, instead
+        # of on every property read
+        data = self.coordinator.data
+        params = {} if data is None else data["params"]
+        self._values = {
+            attribute: params.get(p) for attribute, p in PARAMETER_ATTRIBUTE_MAP.items()
+        }
+        # The condition needs these values, it is not shown when unavailable anyway
+        self._observed_condition = (
+            self._get_observed_condition() if self.available else None
         )
-        self._attr_translation_key = "observations"
-        self._attr_has_entity_name = True
 
-        # Units
-        self._attr_native_wind_speed_unit = UnitOfSpeed.METERS_PER_SECOND
-        self._attr_native_temperature_unit = UnitOfTemperature.CELSIUS
-        self._attr_native_visibility_unit = UnitOfLength.METERS
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update_values()
+        super()._handle_coordinator_update()
 
     @property
     def available(self) -> bool:
@@ -136,35 +173,48 @@ class NLWeatherObservations(CoordinatorEntity[NLWeatherEDRCoordinator], WeatherE
     @property
     def condition(self) -> str | None:
         """Return the current condition."""
+        # Only the day/night part can change in between observations
+        condition = self._observed_condition
+        if condition == ATTR_CONDITION_SUNNY and not self._sun_is_up():
+            condition = ATTR_CONDITION_CLEAR_NIGHT
+
+        return condition
+
+    def _sun_is_up(self) -> bool:
+        # Only changes at sunrise and sunset, so checking once a minute is plenty
+        now = monotonic()
+        if now - self._sun_checked > SUN_CHECK_INTERVAL:
+            self._sun_up = sun.is_up(self.hass)
+            self._sun_checked = now
+        return self._sun_up
+
+    def _get_observed_condition(self) -> str | None:
+        """Derive the condition from the observations."""
         if (c := self.get_latest_range_value(ATTR_WEATHER_CONDITION)) is None:
             return None
 
-        try:
-            condition = CONDITION_MAP[c]
-        except KeyError:
-            _LOGGER.exception("Unknown condition")
+        if (condition := CONDITION_MAP.get(c)) is None:
+            _log_unknown_condition(c)
             return ATTR_CONDITION_SUNNY
 
         # Foggy condition is reported well above 1000 m visibility. Only below 1000 meter it is "fog"
-        if condition == ATTR_CONDITION_FOG and self.native_visibility > 1000:
+        if condition == ATTR_CONDITION_FOG and (self.native_visibility or 0) > 1000:
             condition = ATTR_CONDITION_CLOUDY
 
         # Difference between cloudy, partly cloudy and sunny is not reported
         if condition == ATTR_CONDITION_CLOUDY:
-            if self.cloud_coverage <= 75:
-                condition = ATTR_CONDITION_PARTLYCLOUDY
-            if self.cloud_coverage <= 25:
-                condition = ATTR_CONDITION_SUNNY
-
+            # Not every station reports clouds and wind, missing values leave the
+            # condition cloudy and not windy
+            cloud = self.cloud_coverage
+            if cloud is None:
+                cloud_level = 2
+            else:
+                cloud_level = 0 if cloud <= 25 else 1 if cloud <= 75 else 2
             # Wind speed above 6 Bft or wind gusts above 72 km/h are windy conditions
-            if self.native_wind_speed > 12 or self.native_wind_gust_speed > 20:
-                if self.cloud_coverage <= 75:
-                    condition = ATTR_CONDITION_WINDY
-                else:
-                    condition = ATTR_CONDITION_WINDY_VARIANT
-
-        if condition == ATTR_CONDITION_SUNNY and not sun.is_up(self.hass):
-            condition = ATTR_CONDITION_CLEAR_NIGHT
+            wind_speed = self.native_wind_speed or 0
+            wind_gust_speed = self.native_wind_gust_speed or 0
+            windy = wind_speed > 12 or wind_gust_speed > 20
+            condition = CLOUDY_CONDITIONS[windy][cloud_level]
 
         return condition
 
@@ -208,12 +258,7 @@ class NLWeatherObservations(CoordinatorEntity[NLWeatherEDRCoordinator], WeatherE
         return self.get_latest_range_value(ATTR_WEATHER_HUMIDITY)
 
     def get_latest_range_value(self, attribute) -> float | None:
-        if self.coordinator.data is None:
-            return None
-        p = PARAMETER_ATTRIBUTE_MAP[attribute]
-        if p not in self.coordinator.data["params"]:
-            return None
-        return self.coordinator.data["params"][p]
+        return self._values[attribute]
 
 
 class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEntity):
@@ -225,14 +270,16 @@ class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEn
         | WeatherEntityFeature.FORECAST_HOURLY
         | NLWeatherEntityFeature.FORECAST_MINUTE
     )
-    _hourly_forecast: list[Forecast] = []
-    _daily_forecast: list[Forecast] = []
+    _attr_translation_key = "forecast"
+    _attr_native_wind_speed_unit = UnitOfSpeed.KILOMETERS_PER_HOUR
+    _attr_native_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_native_visibility_unit = UnitOfLength.KILOMETERS
 
     def __init__(
         self,
         coordinator: NLWeatherUpdateCoordinator,
         nowcast_coordinator: NLWeatherNowcastCoordinator | None,
-        config_entry: NLWeatherConfigEntry,
+        device_info: DeviceInfo,
         subentry: ConfigSubentry,
     ) -> None:
         super().__init__(coordinator)
@@ -242,31 +289,24 @@ class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEn
             "lat": subentry.data[CONF_LATITUDE],
             "lon": subentry.data[CONF_LONGITUDE],
         }
-        self._attr_unique_id = (
-            f"{config_entry.entry_id}_{subentry.subentry_id}_forecast"
-        )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_{subentry.subentry_id}")},
-            name=f"Weer {subentry.data[CONF_NAME]}",
-            entry_type=DeviceEntryType.SERVICE,
-            manufacturer="KNMI.nl",
-            model="Waarnemingen, verwachtingen & waarschuwingen",
-            configuration_url="https://www.knmi.nl",
-        )
-        self._attr_translation_key = "forecast"
-        self._attr_has_entity_name = True
+        self._attr_unique_id = f"{device_key(device_info)}_forecast"
+        self._attr_device_info = device_info
 
-        # Units
-        self._attr_native_wind_speed_unit = UnitOfSpeed.KILOMETERS_PER_HOUR
-        self._attr_native_temperature_unit = UnitOfTemperature.CELSIUS
-        self._attr_native_visibility_unit = UnitOfLength.KILOMETERS
+        # Built on first request after each update
+        self._hourly_forecast: list[Forecast] | None = None
+        self._daily_forecast: list[Forecast] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._hourly_forecast = None
+        self._daily_forecast = None
+        super()._handle_coordinator_update()
 
     @property
     def condition(self) -> str | None:
-        # TODO: Handle exceptions
-        return CONDITION_FORECAST_MAP[
+        return _forecast_condition(
             self.coordinator.data["hourly"]["forecast"][0]["weatherType"]
-        ]
+        )
 
     @property
     def native_temperature(self) -> float:
@@ -286,14 +326,14 @@ class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEn
 
     async def async_forecast_hourly(self) -> list[Forecast] | None:
         """Return the hourly forecast in native units."""
-        return [
+        if self._hourly_forecast is not None:
+            return self._hourly_forecast
+        self._hourly_forecast = [
             cast(
                 Forecast,
                 {
                     "datetime": h["dateTime"],
-                    "condition": CONDITION_FORECAST_MAP[
-                        h["weatherType"]
-                    ],  # TODO: Handle exceptions
+                    "condition": _forecast_condition(h["weatherType"]),
                     "native_temperature": h["temperature"],
                     "native_precipitation": h["precipitation"]["amount"],
                     "precipitation_probability": h["precipitation"]["chance"] * 100,
@@ -305,17 +345,18 @@ class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEn
             )
             for h in self.coordinator.data["hourly"]["forecast"]
         ]
+        return self._hourly_forecast
 
     async def async_forecast_daily(self) -> list[Forecast] | None:
         """Return the hourly forecast in native units."""
-        return [
+        if self._daily_forecast is not None:
+            return self._daily_forecast
+        self._daily_forecast = [
             cast(
                 Forecast,
                 {
                     "datetime": d["date"],
-                    "condition": CONDITION_FORECAST_MAP[
-                        d["weatherType"]
-                    ],  # TODO: Handle exceptions
+                    "condition": _forecast_condition(d["weatherType"]),
                     "native_temperature": d["temperature"]["max"],
                     "native_templow": d["temperature"]["min"],
                     "native_precipitation": d["precipitation"]["amount"],
@@ -329,6 +370,7 @@ class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEn
             )
             for d in self.coordinator.data["daily"]["forecast"]
         ]
+        return self._daily_forecast
 
     async def async_get_minute_forecast(self) -> dict[str, list[dict]] | dict:
         """Return minute forecast"""
@@ -339,14 +381,14 @@ class NLWeatherForecast(CoordinatorEntity[NLWeatherUpdateCoordinator], WeatherEn
         result = []
         # Fill the 5 minute values with repeating values every minute
         for item in self._nowcast_coordinator.data:
-            for offset in range(5):
-                t = item["datetime"] + timedelta(minutes=offset)
+            start = item["datetime"]
+            # Skip the 5 minute values that are completely in the past
+            if start + MINUTE_OFFSETS[-1] < now:
+                continue
+            precipitation = item.get("precipitation", 0)
+            for offset in MINUTE_OFFSETS:
+                t = start + offset
                 if t >= now:
-                    result.append(
-                        {
-                            "datetime": t,
-                            "precipitation": item.get("precipitation", 0),
-                        }
-                    )
+                    result.append({"datetime": t, "precipitation": precipitation})
 
         return {"forecast": result}